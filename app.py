@@ -2,21 +2,39 @@ import os
 import json
 import random
 import uuid
+import atexit
+import functools
+import threading
+import time
 from datetime import datetime
 from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 from flask_cors import CORS
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, Json, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from jinja2 import FileSystemBytecodeCache
 import hashlib
-import re
+import string
 import logging
 
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib json fallback always works
+    orjson = None
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
 
+# Templates are static for the process lifetime: compile each one once,
+# skip the per-render mtime check, and reuse compiled bytecode across
+# worker restarts via a cache in the system temp directory
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.auto_reload = False
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,35 +58,99 @@ class Config:
     # Security settings
     MIN_TIME_PER_QUESTION = int(os.environ.get('MIN_TIME_PER_QUESTION', 30))  # seconds
     MAX_QUIZ_TIME = int(os.environ.get('MAX_QUIZ_TIME', 1800))  # 30 minutes
+    COPY_PASTE_THRESHOLD = int(os.environ.get('COPY_PASTE_THRESHOLD', 5))
+    TAB_SWITCH_THRESHOLD = int(os.environ.get('TAB_SWITCH_THRESHOLD', 10))
 
 
 app.config.from_object(Config)
 
 
 # Database connection pool management
+_DB_POOL_MINCONN = 2
+_DB_POOL_MAXCONN = 20
+
+_db_pool: Optional[ThreadedConnectionPool] = None
+_db_pool_lock = threading.Lock()
+# Limits concurrent checkouts so callers wait for a free slot instead of
+# getting a PoolError from getconn(); under gunicorn's gevent worker the
+# monkey-patched semaphore yields to other greenlets while waiting
+_db_pool_slots = threading.BoundedSemaphore(_DB_POOL_MAXCONN)
+
+
+def _get_db_pool() -> ThreadedConnectionPool:
+    """Return the shared connection pool, creating it on first use.
+
+    The pool is created lazily so the app can still be imported when the
+    database is unreachable (e.g. during local development).
+    """
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ThreadedConnectionPool(
+                    minconn=_DB_POOL_MINCONN,
+                    maxconn=_DB_POOL_MAXCONN,
+                    host=app.config['DB_HOST'],
+                    port=app.config['DB_PORT'],
+                    user=app.config['DB_USER'],
+                    password=app.config['DB_PASSWORD'],
+                    dbname=app.config['DB_NAME'],
+                    cursor_factory=RealDictCursor,
+                    connect_timeout=10
+                )
+                atexit.register(_db_pool.closeall)
+    return _db_pool
+
+
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections with proper error handling."""
-    conn = None
+    """Context manager for pooled database connections with proper error handling."""
+    db_pool = _get_db_pool()
+    _db_pool_slots.acquire()
     try:
-        conn = psycopg2.connect(
-            host=app.config['DB_HOST'],
-            port=app.config['DB_PORT'],
-            user=app.config['DB_USER'],
-            password=app.config['DB_PASSWORD'],
-            dbname=app.config['DB_NAME'],
-            cursor_factory=RealDictCursor,
-            connect_timeout=10
-        )
-        yield conn
-    except psycopg2.Error as e:
-        if conn:
-            conn.rollback()
-        logger.error(f"Database error: {e}")
-        raise
+        conn = db_pool.getconn()
+        try:
+            yield conn
+        except psycopg2.Error as e:
+            logger.error(f"Database error: {e}")
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                # Rollback fails when the connection itself is dead (DB restart,
+                # network drop); it is discarded below either way
+                pass
+            finally:
+                # Drop broken connections instead of returning them to the pool
+                db_pool.putconn(conn, close=True)
+            raise
+        except Exception:
+            db_pool.putconn(conn, close=True)
+            raise
+        else:
+            db_pool.putconn(conn)
     finally:
-        if conn:
-            conn.close()
+        _db_pool_slots.release()
+
+
+def execute_prepared(cursor, name: str, statement: str, params: tuple):
+    """Execute a server-side prepared statement, PREPAREing it once per connection.
+
+    Pooled connections are long-lived, so Postgres parses and plans the
+    statement on first use per connection and skips that work on every reuse.
+    The statement must use $1..$N placeholders. If the preparing transaction
+    is rolled back, the connection is dropped by get_db_connection, so the
+    tracking set never outlives the server-side statement.
+    """
+    conn = cursor.connection
+    prepared = getattr(conn, '_prepared_statements', None)
+    if prepared is None:
+        prepared = set()
+        conn._prepared_statements = prepared
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {statement}")
+        prepared.add(name)
+    placeholders = ', '.join(['%s'] * len(params))
+    cursor.execute(f"EXECUTE {name} ({placeholders})", params)
 
 
 def load_json_file(filepath: str) -> Dict[str, Any]:
@@ -84,13 +166,21 @@ def load_json_file(filepath: str) -> Dict[str, Any]:
         raise
 
 
+@functools.lru_cache(maxsize=1)
 def load_questions() -> List[Dict[str, Any]]:
-    """Load questions from JSON file."""
-    return load_json_file(app.config['QUESTIONS_FILE'])
+    """Load questions from JSON file (cached for the process lifetime)."""
+    questions = load_json_file(app.config['QUESTIONS_FILE'])
+    # The quiz form and the submit() lookup both key on question_id, so
+    # synthesize a stable id for any question that doesn't carry one
+    for i, question in enumerate(questions, 1):
+        if not question.get('question_id'):
+            question['question_id'] = f"q_{i}"
+    return questions
 
 
+@functools.lru_cache(maxsize=1)
 def load_quiz_parameters() -> Dict[str, Any]:
-    """Load quiz parameters from JSON file."""
+    """Load quiz parameters from JSON file (cached for the process lifetime)."""
     try:
         return load_json_file(app.config['QUIZ_PARAMS_FILE'])
     except FileNotFoundError:
@@ -102,19 +192,25 @@ def load_quiz_parameters() -> Dict[str, Any]:
         }
 
 
+# Allow letters, whitespace, hyphens, and apostrophes; translating these away
+# leaves an empty string, so any leftover character means the name is invalid
+_STUDENT_NAME_ALLOWED = str.maketrans('', '', string.ascii_letters + string.whitespace + "-'")
+
+
 def validate_student_name(name: str) -> bool:
     """Validate student name format."""
-    if not name or len(name.strip()) < 2:
+    if not name:
         return False
-    # Allow letters, spaces, hyphens, and apostrophes
-    pattern = r"^[a-zA-Z\s\-']+$"
-    return bool(re.match(pattern, name.strip()))
+    stripped = name.strip()
+    return len(stripped) >= 2 and not stripped.translate(_STUDENT_NAME_ALLOWED)
 
 
 def generate_student_hash(name: str, user_agent: str, ip_address: str) -> str:
     """Generate a unique hash for student identification."""
     combined = f"{name.lower().strip()}_{user_agent}_{ip_address}"
-    return hashlib.sha256(combined.encode()).hexdigest()
+    # BLAKE2b is faster than SHA-256 in pure software; digest_size=32 keeps
+    # the same 64-char hex output the sha256 version produced
+    return hashlib.blake2b(combined.encode(), digest_size=32).hexdigest()
 
 
 def check_duplicate_attempt(student_hash: str, session_id: str) -> bool:
@@ -123,14 +219,13 @@ def check_duplicate_attempt(student_hash: str, session_id: str) -> bool:
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
-                    """SELECT COUNT(*) FROM session_info 
-                       WHERE student_hash = %s AND session_id != %s 
-                       AND submission_time > NOW() - INTERVAL '24 hours'""",
+                    """SELECT 1 FROM session_info
+                       WHERE student_hash = %s AND session_id != %s
+                       AND submission_time > NOW() - INTERVAL '24 hours'
+                       LIMIT 1""",
                     (student_hash, session_id)
                 )
-                result = cursor.fetchone()
-                count = result[0] if result else 0
-                return count > 0
+                return cursor.fetchone() is not None
     except Exception as e:
         logger.error(f"Error checking duplicate attempts: {e}")
         return False
@@ -146,7 +241,9 @@ def select_random_questions(questions_list: List[Dict[str, Any]]) -> List[Dict[s
             f"Not enough questions available. Requested: {num_questions}, Available: {len(questions_list)}")
         return questions_list
 
-    return random.sample(questions_list, num_questions)
+    # A fresh Random instance per call keeps sampling isolated from anything
+    # that reseeds or shares the module-level RNG state
+    return random.Random().sample(questions_list, num_questions)
 
 
 def generate_session_id() -> str:
@@ -155,18 +252,24 @@ def generate_session_id() -> str:
 
 
 def create_initial_session_info(session_id: str, student_name: str, student_hash: str,
-                                page_load_time: datetime, num_questions: int, passing_level: float):
+                                page_load_time: datetime, num_questions: int, passing_level: float,
+                                selected_questions: List[Dict[str, Any]]):
     """Create initial session info in database immediately when quiz starts."""
+    # Pull everything off the request before holding a pooled connection
+    ip_address = request.remote_addr
+    user_agent = request.headers.get('User-Agent')
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(
-                    """INSERT INTO session_info 
-                       (session_id, student_name, student_hash, page_load_time, submission_time, 
-                        num_questions, passing_level, ip_address, user_agent) 
-                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                execute_prepared(
+                    cursor,
+                    'session_info_insert',
+                    """INSERT INTO session_info
+                       (session_id, student_name, student_hash, page_load_time, submission_time,
+                        num_questions, passing_level, ip_address, user_agent, selected_questions)
+                       VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)""",
                     (session_id, student_name, student_hash, page_load_time, None,  # submission_time is NULL initially
-                     num_questions, passing_level, request.remote_addr, request.headers.get('User-Agent'))
+                     num_questions, passing_level, ip_address, user_agent, Json(selected_questions))
                 )
                 conn.commit()
                 logger.info(f"Initial session info created for session_id: {session_id}")
@@ -175,87 +278,106 @@ def create_initial_session_info(session_id: str, student_name: str, student_hash
         raise
 
 
-def update_session_submission_time(session_id: str):
-    """Update the submission time when quiz is completed."""
+def get_session_questions(session_id: str) -> List[Dict[str, Any]]:
+    """Fetch the questions selected for a session from the database."""
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
-                    """UPDATE session_info SET submission_time = %s WHERE session_id = %s""",
-                    (datetime.now(), session_id)
+                    """SELECT selected_questions FROM session_info WHERE session_id = %s""",
+                    (session_id,)
                 )
-                conn.commit()
-                logger.info(f"Submission time updated for session_id: {session_id}")
+                row = cursor.fetchone()
+                return row['selected_questions'] if row and row['selected_questions'] else []
     except Exception as e:
-        logger.error(f"Error updating submission time: {e}")
-        raise
+        logger.error(f"Error fetching session questions: {e}")
+        return []
+
+
+def parse_client_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+    """Convert an ISO timestamp string from the frontend to a datetime, or None."""
+    if not timestamp:
+        return None
+    # The quiz page sends plain 'YYYY-MM-DD HH:MM:SS' strings, which
+    # datetime.fromisoformat parses directly in C; only rewrite a trailing
+    # 'Z' into an explicit UTC offset when it is actually present
+    if timestamp.endswith('Z'):
+        timestamp = timestamp[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(timestamp)
+    except ValueError:
+        logger.warning(f"Invalid timestamp format: {timestamp}")
+        return None
 
 
-def save_quiz_log(session_id: str, question_number: int, question_data: Dict[str, Any],
-                  user_answers: List[str], is_correct: bool,
-                  first_modified_time: Optional[str], last_modified_time: Optional[str],
-                  copy_paste_attempts: int = 0, tab_switches: int = 0):
-    """Save quiz log entry to database."""
+def save_quiz_logs(session_id: str, rows: List[tuple]):
+    """Save all quiz log entries and stamp the submission time in one transaction."""
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
-                # Convert timestamp strings to datetime objects if they exist
-                first_modified_dt = None
-                last_modified_dt = None
-
-                if first_modified_time:
-                    try:
-                        first_modified_dt = datetime.fromisoformat(first_modified_time.replace('Z', '+00:00'))
-                    except ValueError:
-                        logger.warning(f"Invalid first_modified_time format: {first_modified_time}")
-
-                if last_modified_time:
-                    try:
-                        last_modified_dt = datetime.fromisoformat(last_modified_time.replace('Z', '+00:00'))
-                    except ValueError:
-                        logger.warning(f"Invalid last_modified_time format: {last_modified_time}")
-
-                query = """INSERT INTO quiz_log 
-                          (session_id, question_number, question_id, question, user_answers, 
-                           correct_answers, is_correct, first_modified_time, last_modified_time,
-                           copy_paste_attempts, tab_switches) 
-                          VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
-
-                cursor.execute(query, (
-                    session_id,
-                    question_number,
-                    question_data.get('question_id', f"q_{question_number}"),
-                    question_data['question'],
-                    '|'.join(user_answers) if user_answers else '',
-                    '|'.join(question_data['correct_answers']),
-                    is_correct,
-                    first_modified_dt,
-                    last_modified_dt,
-                    copy_paste_attempts,
-                    tab_switches
-                ))
+                if rows:
+                    execute_values(
+                        cursor,
+                        """INSERT INTO quiz_log
+                           (session_id, question_number, question_id, question, user_answers,
+                            correct_answers, is_correct, first_modified_time, last_modified_time,
+                            copy_paste_attempts, tab_switches)
+                           VALUES %s""",
+                        rows,
+                        page_size=100
+                    )
+                cursor.execute(
+                    """UPDATE session_info SET submission_time = %s
+                       WHERE session_id = %s RETURNING session_id""",
+                    (datetime.now(), session_id)
+                )
+                if cursor.fetchone() is None:
+                    logger.warning(f"No session_info row found for session_id: {session_id}")
                 conn.commit()
-                logger.info(f"Quiz log saved for session_id: {session_id}, question: {question_number}")
+                logger.info(f"Quiz log saved for session_id: {session_id}, questions: {len(rows)}")
     except Exception as e:
         logger.error(f"Error saving quiz log: {e}")
         raise
 
 
+def serialize_event_details(event_details: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Serialize security-event details to JSON, preferring orjson when available."""
+    if not event_details:
+        return None
+    if orjson is not None:
+        return orjson.dumps(event_details).decode()
+    return json.dumps(event_details)
+
+
 def log_security_event(session_id: str, event_type: str, event_details: Dict[str, Any] = None):
-    """Log security events to the security_events table."""
+    """Log a single security event to the security_events table."""
+    log_security_events(session_id, [(event_type, event_details)])
+
+
+def log_security_events(session_id: str, events: List[tuple]):
+    """Log a batch of (event_type, event_details) pairs in one INSERT."""
+    if not events:
+        return
+    # Serialize and read the request before holding a pooled connection
+    ip_address = request.remote_addr
+    user_agent = request.headers.get('User-Agent')
+    rows = [
+        (session_id, event_type, serialize_event_details(event_details), ip_address, user_agent)
+        for event_type, event_details in events
+    ]
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
-                # Convert event_details to JSON if it's provided
-                details_json = json.dumps(event_details) if event_details else None
-
-                cursor.execute(
+                execute_values(
+                    cursor,
                     """INSERT INTO security_events (session_id, event_type, event_details, ip_address, user_agent)
-                       VALUES (%s, %s, %s, %s, %s)""",
-                    (session_id, event_type, details_json, request.remote_addr, request.headers.get('User-Agent'))
+                       VALUES %s""",
+                    rows
                 )
                 conn.commit()
-                logger.info(f"Security event logged: {event_type} for session: {session_id}")
+                logger.info(
+                    f"Security events logged: {', '.join(event_type for event_type, _ in events)} "
+                    f"for session: {session_id}")
     except Exception as e:
         logger.error(f"Error logging security event: {e}")
 
@@ -314,15 +436,16 @@ def start_quiz():
             student_hash,
             page_load_time,
             params.get('num_questions', 2),
-            params.get('passing_level', 0.7)
+            params.get('passing_level', 0.7),
+            selected_questions
         )
     except Exception as e:
         logger.error(f"Error creating session info: {e}")
         flash('Error starting quiz. Please try again later.', 'error')
         return redirect(url_for('index'))
 
-    # STEP 2: Now store in session for frontend use
-    session['current_questions'] = selected_questions
+    # STEP 2: Now store in session for frontend use; the selected questions
+    # live in session_info, keeping the session cookie small
     session['session_id'] = session_id
     session['student_name'] = student_name
     session['student_hash'] = student_hash
@@ -370,14 +493,19 @@ def submit():
         passing_level = params.get('passing_level', 0.7)
         num_questions = params.get('num_questions', 2)
 
-        # Get session data
-        selected_questions = session.get('current_questions', [])
+        # Get session data; the selected questions are stored server-side
+        selected_questions = get_session_questions(session_id)
         session_id = session.get('session_id')
         student_name = session.get('student_name')
         student_hash = session.get('student_hash')
         page_load_time_str = session.get('page_load_time')
-        copy_paste_attempts = session.get('copy_paste_attempts', 0)
-        tab_switches = session.get('tab_switches', 0)
+        # Reconcile the session counters with the totals the quiz form posts
+        # as hidden fields: a coalesced /log_activity flush aborted by the
+        # submit navigation can leave the session behind the client
+        copy_paste_attempts = max(session.get('copy_paste_attempts', 0),
+                                  request.form.get('copy_paste_attempts', default=0, type=int))
+        tab_switches = max(session.get('tab_switches', 0),
+                           request.form.get('tab_switches', default=0, type=int))
 
         if not all([selected_questions, session_id, student_name, page_load_time_str]):
             flash('Session expired. Please start the quiz again.', 'error')
@@ -389,37 +517,44 @@ def submit():
         time_elapsed = (datetime.now() - page_load_time).total_seconds()
         min_required_time = len(selected_questions) * app.config['MIN_TIME_PER_QUESTION']
 
-        # Update submission time in session_info
-        update_session_submission_time(session_id)
-
         # Process answers
         score = 0
         results = []
-        suspicious_activity = copy_paste_attempts > 5 or tab_switches > 10
+        quiz_log_rows = []
+        suspicious_activity = (copy_paste_attempts > app.config['COPY_PASTE_THRESHOLD'] or
+                               tab_switches > app.config['TAB_SWITCH_THRESHOLD'])
 
         for question_number, question in enumerate(selected_questions, 1):
-            # Handle different ways the form data might be structured
-            question_key = question.get('question_id', question['question'])
+            # The quiz form posts answers and timestamps under the question_id
+            question_key = str(question.get('question_id', question['question']))
             user_answers = request.form.getlist(question_key)
 
-            # If no answers found with question_id, try with question text
-            if not user_answers:
-                user_answers = request.form.getlist(question['question'])
-
             correct_answers = question['correct_answers']
+            correct_set = frozenset(correct_answers)
 
-            # Check if answer is correct
-            is_correct = (set(user_answers) == set(correct_answers) and
-                          len(user_answers) == len(correct_answers))
+            # Check if answer is correct: the cheap length check short-circuits
+            # before any set is built from the user's answers
+            is_correct = (len(user_answers) == len(correct_answers) and
+                          frozenset(user_answers) == correct_set)
 
             # Get timing data
-            first_modified_time = request.form.get(f"first_modified_{question.get('question_id', question_number)}")
-            last_modified_time = request.form.get(f"last_modified_{question.get('question_id', question_number)}")
-
-            # Save to database
-            save_quiz_log(session_id, question_number, question, user_answers,
-                          is_correct, first_modified_time, last_modified_time,
-                          copy_paste_attempts, tab_switches)
+            first_modified_time = request.form.get(f"first_modified_{question_key}")
+            last_modified_time = request.form.get(f"last_modified_{question_key}")
+
+            # Build the row for the batched INSERT after the loop
+            quiz_log_rows.append((
+                session_id,
+                question_number,
+                question.get('question_id', f"q_{question_number}"),
+                question['question'],
+                user_answers,
+                correct_answers,
+                is_correct,
+                parse_client_timestamp(first_modified_time),
+                parse_client_timestamp(last_modified_time),
+                copy_paste_attempts,
+                tab_switches
+            ))
 
             # Add to results
             results.append({
@@ -433,6 +568,9 @@ def submit():
             if is_correct:
                 score += 1
 
+        # Save all questions and the submission time in one round-trip
+        save_quiz_logs(session_id, quiz_log_rows)
+
         # Log suspicious activity if detected
         if suspicious_activity:
             log_security_event(session_id, 'SUSPICIOUS_ACTIVITY', {
@@ -440,8 +578,8 @@ def submit():
                 'tab_switches': tab_switches,
                 'student_name': student_name,
                 'threshold_exceeded': {
-                    'copy_paste': copy_paste_attempts > 5,
-                    'tab_switches': tab_switches > 10
+                    'copy_paste': copy_paste_attempts > app.config['COPY_PASTE_THRESHOLD'],
+                    'tab_switches': tab_switches > app.config['TAB_SWITCH_THRESHOLD']
                 }
             })
 
@@ -479,30 +617,53 @@ def submit():
 
 @app.route('/log_activity', methods=['POST'])
 def log_activity():
-    """Log suspicious activities like copy-paste attempts and tab switches."""
+    """Log suspicious activities like copy-paste attempts and tab switches.
+
+    The frontend coalesces events and posts them in batches as
+    {'events': [{'type': 'copy_paste', 'count': 2}, ...]}; a bare
+    {'type': ...} payload is still accepted for single events.
+    """
     if 'session_id' not in session:
         return jsonify({'status': 'error', 'message': 'No active session'})
 
     try:
-        activity_type = request.json.get('type')
+        payload = request.json or {}
+        events = payload.get('events')
+        if events is None and payload.get('type'):
+            events = [{'type': payload['type'], 'count': 1}]
+
         session_id = session.get('session_id')
 
         # Check if session exists in database before logging
         if not session_id:
             return jsonify({'status': 'error', 'message': 'No session ID'})
 
-        if activity_type == 'copy_paste':
-            session['copy_paste_attempts'] = session.get('copy_paste_attempts', 0) + 1
-            log_security_event(session_id, 'COPY_PASTE_ATTEMPT', {
-                'total_attempts': session['copy_paste_attempts'],
-                'timestamp': datetime.now().isoformat()
-            })
-        elif activity_type == 'tab_switch':
-            session['tab_switches'] = session.get('tab_switches', 0) + 1
-            log_security_event(session_id, 'TAB_SWITCH', {
-                'total_switches': session['tab_switches'],
-                'timestamp': datetime.now().isoformat()
-            })
+        # Once a counter is past its threshold the suspicious-activity verdict
+        # can't change, so keep counting but stop writing security events
+        security_events = []
+        timestamp = datetime.now().isoformat()
+        for event in events or []:
+            count = max(1, int(event.get('count', 1)))
+            if event.get('type') == 'copy_paste':
+                already_over = session.get('copy_paste_attempts', 0) > app.config['COPY_PASTE_THRESHOLD']
+                session['copy_paste_attempts'] = session.get('copy_paste_attempts', 0) + count
+                if not already_over:
+                    security_events.append(('COPY_PASTE_ATTEMPT', {
+                        'count': count,
+                        'total_attempts': session['copy_paste_attempts'],
+                        'timestamp': timestamp
+                    }))
+            elif event.get('type') == 'tab_switch':
+                already_over = session.get('tab_switches', 0) > app.config['TAB_SWITCH_THRESHOLD']
+                session['tab_switches'] = session.get('tab_switches', 0) + count
+                if not already_over:
+                    security_events.append(('TAB_SWITCH', {
+                        'count': count,
+                        'total_switches': session['tab_switches'],
+                        'timestamp': timestamp
+                    }))
+
+        log_security_events(session_id, security_events)
 
         return jsonify({'status': 'logged'})
     except Exception as e:
@@ -510,18 +671,37 @@ def log_activity():
         return jsonify({'status': 'error', 'message': 'Failed to log activity'})
 
 
+# Health-probe cache so aggressive load-balancer polling doesn't burn a
+# pooled connection on every request
+_HEALTH_CHECK_TTL = 5.0  # seconds
+_health_lock = threading.Lock()
+_health_state = {'healthy': False, 'error': None, 'checked_at': 0.0}
+
+
 @app.route('/health')
 def health_check():
-    """Health check endpoint."""
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("SELECT 1")
-                result = cursor.fetchone()
+    """Health check endpoint; the DB probe result is cached for a short TTL."""
+    with _health_lock:
+        fresh = time.monotonic() - _health_state['checked_at'] < _HEALTH_CHECK_TTL
+        healthy = _health_state['healthy']
+        error = _health_state['error']
+
+    if not fresh:
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+            healthy, error = True, None
+        except Exception as e:
+            logger.error(f"Health check failed: {e}")
+            healthy, error = False, str(e)
+        with _health_lock:
+            _health_state.update(healthy=healthy, error=error, checked_at=time.monotonic())
+
+    if healthy:
         return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()}), 200
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
+    return jsonify({'status': 'unhealthy', 'error': error}), 500
 
 
 @app.errorhandler(500)
@@ -562,6 +742,8 @@ def not_found_error(error):
 
 
 if __name__ == '__main__':
+    # Development server only; in production run under Gunicorn with gevent
+    # workers: gunicorn -c gunicorn.conf.py app:app
     # Test database connection on startup
     try:
         with get_db_connection() as conn:
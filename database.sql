@@ -8,8 +8,9 @@ CREATE TABLE session_info
     submission_time     TIMESTAMP    NOT NULL,
     num_questions       INTEGER      NOT NULL,
     passing_level       REAL         NOT NULL,
-    ip_address          INET,                      
-    user_agent          TEXT,                      
+    ip_address          INET,
+    user_agent          TEXT,
+    selected_questions  JSONB,
     created_at          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -20,8 +21,8 @@ CREATE TABLE quiz_log
     question_number     INTEGER,
     question_id         INTEGER,
     question            VARCHAR(255),
-    user_answers        TEXT,
-    correct_answers     TEXT,
+    user_answers        TEXT[],
+    correct_answers     TEXT[],
     is_correct          BOOLEAN,
     first_modified_time TIMESTAMP,
     last_modified_time  TIMESTAMP,
@@ -43,7 +44,9 @@ CREATE TABLE security_events
 );
 -- Indexes for better performance
 CREATE INDEX idx_session_info_student ON session_info(student_name);
-CREATE INDEX idx_session_info_hash ON session_info(student_hash);
+-- Composite index serves the duplicate-attempt lookup
+-- (student_hash equality + submission_time range) in one scan
+CREATE INDEX idx_session_info_hash_time ON session_info(student_hash, submission_time);
 CREATE INDEX idx_session_info_time ON session_info(submission_time);
 CREATE INDEX idx_quiz_log_session ON quiz_log(session_id);
 CREATE INDEX idx_quiz_log_correct ON quiz_log(is_correct);
@@ -0,0 +1,27 @@
+"""Gunicorn configuration for production deployment.
+
+The built-in Flask dev server handles one request at a time, so every
+pooled DB connection wait blocks all other students. Gevent workers let
+each worker overlap many I/O-bound requests.
+
+Run with: gunicorn -c gunicorn.conf.py app:app
+"""
+import multiprocessing
+
+bind = '0.0.0.0:5000'
+worker_class = 'gevent'
+workers = multiprocessing.cpu_count() * 2 + 1
+# Concurrent greenlets may exceed the DB pool size (20 per worker);
+# get_db_connection() makes the excess wait on a semaphore for a free pool
+# slot rather than fail with PoolError
+worker_connections = 100
+timeout = 60
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Make psycopg2 yield to the gevent hub on socket waits; without this
+    # patch its C-level I/O blocks the whole worker on every DB round-trip
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()